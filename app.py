@@ -1,165 +1,290 @@
+import io
 import os
+import queue
 import re
 import streamlit as st
-import google.generativeai as genai
-import pdfplumber
-import docx2txt
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import logging
-
-# Suppress pdf-related warnings
-logging.getLogger("pdfminer").setLevel(logging.ERROR)
-logging.getLogger("pdfplumber").setLevel(logging.ERROR)
+from parsing import FIELDS, clean_resume, extract_contact_fields, parse_analysis
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 MODEL_NAME = "models/gemini-2.0-flash"
 
+# No real resume needs more than this; bounds extraction time on huge uploads
+MAX_PDF_PAGES = 20
+MAX_RESUME_CHARS = 50_000
+
+# Larger uploads fall back to one concurrent Gemini call per resume
+MAX_BATCH_RESUMES = 10
+MAX_BATCH_CHARS = 60_000
+GEMINI_MAX_WORKERS = 8
+BATCH_RE = re.compile(r"=== RESUME (\d+) ===\n(.*?)\n=== END RESUME \1 ===", re.DOTALL)
+
 # --- Helper Functions ---
-def extract_text_from_file(uploaded_file):
+@st.cache_data(show_spinner=False)
+def extract_text_cached(file_bytes, filename):
     try:
-        if uploaded_file.name.endswith(".pdf"):
-            with pdfplumber.open(uploaded_file) as pdf:
-                return "\n".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-        elif uploaded_file.name.endswith(".docx"):
-            return docx2txt.process(uploaded_file)
+        if filename.endswith(".pdf"):
+            import fitz  # PyMuPDF; imported lazily to keep cold start fast
+            with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+                chars = 0
+                out = []
+                for i, page in enumerate(doc):
+                    if chars > MAX_RESUME_CHARS or i >= MAX_PDF_PAGES:
+                        st.info(f"{filename} is unusually long; only the first {i} pages were read.")
+                        break
+                    text = page.get_text("text")
+                    if text.strip():
+                        out.append(text)
+                        chars += len(text)
+                return "\n".join(out)
+        elif filename.endswith(".docx"):
+            import docx2txt
+            return docx2txt.process(io.BytesIO(file_bytes))
         else:
             st.warning("Unsupported file format. Please upload a PDF or DOCX file.")
     except Exception as e:
-        st.error(f"Error extracting text from {uploaded_file.name}: {e}")
+        st.error(f"Error extracting text from {filename}: {e}")
     return ""
 
-def analyze_resume_with_gemini(resume_text, model_instance):
-    prompt = f"""Extract the following fields from the resume:
+def extract_text_from_file(uploaded_file):
+    return clean_resume(extract_text_cached(uploaded_file.getvalue(), uploaded_file.name))
 
-Resume:
----
-{resume_text}
----
+# Analysis is defined in parsing.py, not this script, so it pickles cleanly across reruns
+@st.cache_data(show_spinner=False)
+def parse_analysis_cached(result_text, known):
+    return parse_analysis(result_text, known)
 
-Instructions for Output:
+@st.cache_resource
+def get_model(model_name=MODEL_NAME):
+    # Configure the SDK and build the client once per process, not on every rerun
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(model_name)
+
+_FIELD_HINTS = {"Skills": " (all technical and soft skills listed)"}
+
+def _output_instructions(fields):
+    field_lines = "\n".join(f"    - {field}{_FIELD_HINTS.get(field, '')}" for field in fields)
+    return f"""Instructions for Output:
 1. Extract and return these fields as separate sections (even if not found, state 'Not Found' or 'None'):
-    - Name
-    - Contact
-    - Email-ID
-    - Skills (all technical and soft skills listed)
+{field_lines}
 2. Format output clearly:
     - Each section should start with its name (e.g., "Name") on a new line.
     - List items within sections using hyphens (e.g., "- Skill 1"). Do not use asterisks.
     - Return ONLY the section-wise breakdown. Do not add any extra explanations, conversational text, or disclaimers.
     - Ensure each requested section header is present in your output, even if its content is "None".
 """
+
+def build_prompt(resume_text, fields=FIELDS):
+    return f"""Extract the following fields from the resume:
+
+Resume:
+---
+{resume_text}
+---
+
+{_output_instructions(fields)}"""
+
+def build_batch_prompt(resume_texts, fields=FIELDS):
+    blocks = "\n\n".join(
+        f"=== RESUME {i} ===\n{text}\n=== END RESUME {i} ==="
+        for i, text in enumerate(resume_texts, start=1)
+    )
+    return f"""Extract the following fields from each of the {len(resume_texts)} resumes below:
+
+{blocks}
+
+{_output_instructions(fields)}3. Output one block per resume, in the same order as the input:
+    - Start each block with "=== RESUME i ===" and end it with "=== END RESUME i ===" on their own lines, where i is the resume's number above.
+"""
+
+def _gemini_executor(max_workers=GEMINI_MAX_WORKERS):
+    # Pool threads call cached functions (_cached_generate, get_model). Attaching this run's
+    # ScriptRunContext lets Streamlit's caches treat them as part of the script run.
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx()),
+    )
+
+# Keyed on prompt + model name only, so streamed and pooled calls share one entry;
+# failed calls raise and are never cached. _on_chunk is not hashed: when set, the response
+# is streamed and each chunk handed to it. Nothing here may draw on the page, since
+# elements created inside a cached function are recorded for replay.
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_generate(prompt, model_name, _on_chunk=None):
+    model = get_model(model_name)
+    if _on_chunk is None:
+        return model.generate_content(prompt).text.strip()
+    buf = []
+    for chunk in model.generate_content(prompt, stream=True):
+        buf.append(chunk.text)
+        _on_chunk(chunk.text)
+    return "".join(buf).strip()
+
+def _generate_streaming(prompt, model_name):
+    # The cached call runs on a worker and passes chunks back through a queue; this
+    # (script) thread draws them. A cache hit returns at once with nothing to stream.
+    chunks = queue.Queue()
+    placeholder = st.empty()
+    shown = []
+    try:
+        with _gemini_executor(max_workers=1) as ex:
+            future = ex.submit(_cached_generate, prompt, model_name, chunks.put)
+            while not (future.done() and chunks.empty()):
+                try:
+                    shown.append(chunks.get(timeout=0.1))
+                except queue.Empty:
+                    continue
+                placeholder.markdown("".join(shown))
+            return future.result()
+    finally:
+        # Also clear partial output when the stream fails midway
+        placeholder.empty()
+
+def generate_text(prompt, model_name=MODEL_NAME, stream=False):
+    # Only stream from the script thread, never from the worker pool
+    if stream:
+        return _generate_streaming(prompt, model_name)
+    return _cached_generate(prompt, model_name)
+
+# Returns (result_text, known): regex-found fields travel alongside Gemini's output.
+# No st.* calls here unless stream=True: this also runs on worker threads.
+# Errors are shown by the render step.
+def analyze_resume_with_gemini(resume_text, model_name=MODEL_NAME, stream=False):
+    known = extract_contact_fields(resume_text)
+    fields = [field for field in FIELDS if field not in known]
     try:
-        response = model_instance.generate_content(prompt)
-        return response.text.strip()
+        return generate_text(build_prompt(resume_text, fields), model_name, stream), known
     except Exception as e:
-        st.error(f"Gemini API Error: {str(e)}")
-        return f"Error during Gemini API call: {str(e)}"
+        return f"Error during Gemini API call: {str(e)}", known
+
+def analyze_resumes_with_gemini(resume_texts, model_name=MODEL_NAME):
+    if len(resume_texts) == 1:
+        return [analyze_resume_with_gemini(resume_texts[0], model_name, stream=True)]
+
+    results = [None] * len(resume_texts)
+    if len(resume_texts) <= MAX_BATCH_RESUMES and sum(map(len, resume_texts)) <= MAX_BATCH_CHARS:
+        knowns = [extract_contact_fields(text) for text in resume_texts]
+        # One prompt for the batch: skip a field only if regex found it in every resume
+        fields = [field for field in FIELDS if any(field not in known for known in knowns)]
+        try:
+            response = generate_text(build_batch_prompt(resume_texts, fields), model_name, stream=True)
+            for match in BATCH_RE.finditer(response):
+                i = int(match.group(1)) - 1
+                if 0 <= i < len(results) and results[i] is None:
+                    results[i] = (match.group(2).strip(), knowns[i])
+        except Exception as e:
+            st.warning(f"Batch analysis failed, analyzing resumes individually: {e}")
+
+    # Too large to batch, or missing from the batch response: one call per resume, concurrently
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        with _gemini_executor() as ex:
+            texts = [resume_texts[i] for i in pending]
+            for i, result in zip(pending, ex.map(analyze_resume_with_gemini, texts, [model_name] * len(texts))):
+                results[i] = result
+    return results
+
+def process_resumes(resume_files, model_name=MODEL_NAME):
+    # Batched uploads go out as one prompt, so every text is needed before calling Gemini
+    if len(resume_files) <= MAX_BATCH_RESUMES:
+        extracted = [(f.name, extract_text_from_file(f)) for f in resume_files]
+        extracted = [(name, text) for name, text in extracted if text]
+        if not extracted:
+            return []
+        results = analyze_resumes_with_gemini([text for _, text in extracted], model_name)
+        return [(name, result, known) for (name, _), (result, known) in zip(extracted, results)]
+
+    # Larger uploads are pipelined: each Gemini call starts as soon as its text is ready.
+    # Extraction itself stays on this thread because PyMuPDF is not thread-safe.
+    futures = []
+    with _gemini_executor() as ex:
+        for f in resume_files:
+            text = extract_text_from_file(f)
+            if text:
+                futures.append((f.name, ex.submit(analyze_resume_with_gemini, text, model_name)))
+        return [(name, *future.result()) for name, future in futures]
 
 # --- Streamlit App ---
 st.set_page_config(page_title="ATS Resume Extractor", layout="wide")
 st.title("📄 ATS Resume Extractor")
-st.markdown("Upload a resume. The app extracts Name, Contact, Email-ID, and Skills.")
+st.markdown("Upload one or more resumes. The app extracts Name, Contact, Email-ID, and Skills.")
 
 # Load Gemini
+if not GEMINI_API_KEY:
+    st.error("GEMINI_API_KEY not found. Please set it in your .env file.")
+    st.stop()
 try:
-    if not GEMINI_API_KEY:
-        st.error("GEMINI_API_KEY not found. Please set it in your .env file.")
-        st.stop()
-    genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel(MODEL_NAME)
+    get_model(MODEL_NAME)
 except Exception as e:
     st.error(f"Error initializing Gemini model: {e}")
     st.stop()
 
 # Initialize session state
-for key, default_val in [("processed", False), ("result", ""), ("resume_filename", ""), ("excel_format", "")]:
+for key, default_val in [("processed", False), ("results", []), ("resume_filenames", ()), ("excel_format", "")]:
     st.session_state.setdefault(key, default_val)
 
-st.subheader("Upload Resume")
-resume_file = st.file_uploader("Formats: PDF, DOCX", type=["pdf", "docx"], key="resume_uploader")
+st.subheader("Upload Resumes")
+resume_files = st.file_uploader("Formats: PDF, DOCX", type=["pdf", "docx"], key="resume_uploader", accept_multiple_files=True)
 
-current_resume_name = resume_file.name if resume_file else None
-resume_changed = current_resume_name and st.session_state.resume_filename != current_resume_name
+current_resume_names = tuple(f.name for f in resume_files)
+resume_changed = current_resume_names and st.session_state.resume_filenames != current_resume_names
 
 if resume_changed:
     st.session_state.processed = False
-    st.session_state.result = ""
+    st.session_state.results = []
     st.session_state.excel_format = ""
-    st.session_state.resume_filename = current_resume_name
+    st.session_state.resume_filenames = current_resume_names
 
 # Process and analyze
-if not st.session_state.processed and resume_file:
-    with st.spinner(f"Extracting text from {resume_file.name}..."):
-        resume_text = extract_text_from_file(resume_file)
-    if resume_text:
-        with st.spinner("🤖 Gemini is analyzing..."):
-            st.session_state.result = analyze_resume_with_gemini(resume_text, gemini_model)
-        st.session_state.processed = True
-    else:
-        st.session_state.processed = True
+if not st.session_state.processed and resume_files:
+    with st.spinner(f"🤖 Extracting and analyzing {len(resume_files)} resume(s)..."):
+        st.session_state.results = process_resumes(resume_files, MODEL_NAME)
+    st.session_state.processed = True
 
 # Extract fields and generate Excel format
-if st.session_state.result:
-    result_text = st.session_state.result
-    if result_text.startswith("Error during Gemini API call"):
-        st.error(result_text)
-    else:
-        fields = ["Name", "Contact", "Email-ID", "Skills"]
-        extracted_fields = {}
-        for field in fields:
-            pattern = rf"^{re.escape(field)}[^\n]*\n(.*?)(?=\n(?:{'|'.join(re.escape(f) for f in fields)})[^\n]*\n|\Z)"
-            match = re.search(pattern, result_text, re.IGNORECASE | re.DOTALL | re.MULTILINE)
-            if match:
-                content = match.group(1).strip()
-                extracted_fields[field] = content if content else "Not Found"
-            else:
-                extracted_fields[field] = "Not Found"
-
-        # Create Excel-formatted line
+if st.session_state.results:
+    parsed = []
+    excel_rows = []
+    for filename, result_text, known in st.session_state.results:
+        if result_text.startswith("Error during Gemini API call"):
+            st.error(f"{filename}: {result_text}")
+            continue
+        analysis = parse_analysis_cached(result_text, known)
+        excel_rows.append(analysis.excel_row)
+        parsed.append((filename, analysis, result_text))
+
+    if parsed:
         excel_headers = ["Name", "Contact No.", "Email-ID", "Skills"]
-        cleaned_data = []
-        for field in fields:
-            value = extracted_fields.get(field, "Not Found")
-            cleaned_value = value.replace('\n', ' ').replace('\r', ' ').strip()
-            cleaned_value = re.sub(r'[-•*]\s*', '', cleaned_value)
-            cleaned_data.append(cleaned_value)
-        full_excel_format = "\t".join(cleaned_data)
+        full_excel_format = "\n".join(excel_rows)
         st.session_state.excel_format = full_excel_format
 
         # --- Show COPY TO EXCEL block here ---
         st.markdown("---")
         st.markdown("### 📋 Copy for Excel")
 
-        st.components.v1.html(f"""
-            <div style="font-family: Arial, sans-serif;">
-              <textarea id="excelData" rows="4" style="width: 100%; padding: 10px; font-family: monospace; border: 1px solid #ccc; border-radius: 5px;">{full_excel_format}</textarea>
-              <button onclick="copyToClipboard()" style="margin-top: 10px; background-color: #4CAF50; color: white; border: none; padding: 8px 16px; border-radius: 5px; cursor: pointer;">
-                📋 Copy
-              </button>
-            </div>
-            <script>
-            function copyToClipboard() {{
-                const textarea = document.getElementById("excelData");
-                textarea.select();
-                document.execCommand("copy");
-                alert("✅ Data copied to clipboard!");
-            }}
-            </script>
-        """, height=180)
-
-        st.info("💡 Tip: Paste this into Excel. It will auto-fill Name, Contact No., Email-ID, and Skills.")
+        # st.code ships a built-in copy button, so no iframe component is needed
+        st.code(full_excel_format, language=None)
+
+        st.info("💡 Tip: Paste this into Excel. Each resume fills one row with Name, Contact No., Email-ID, and Skills.")
 
         # Show extracted fields
         st.markdown("---")
         st.subheader("📊 Extracted Fields")
-        for field, value in extracted_fields.items():
-            st.markdown(f"**{field}:**")
-            st.code(value, language=None)
+        for filename, analysis, result_text in parsed:
+            if len(parsed) > 1:
+                st.markdown(f"#### {filename}")
+            for field, value in analysis.fields.items():
+                st.markdown(f"**{field}:**")
+                st.code(value, language=None)
 
-        with st.expander("📄 Full Extraction Output"):
-            st.markdown(result_text)
+            with st.expander("📄 Full Extraction Output"):
+                st.markdown(result_text)
 
-elif st.session_state.processed and not st.session_state.result:
-    if not resume_file:
-        st.info("Please upload a resume to begin extraction.")
+elif st.session_state.processed and not st.session_state.results:
+    if not resume_files:
+        st.info("Please upload one or more resumes to begin extraction.")
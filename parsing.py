@@ -0,0 +1,72 @@
+import re
+from dataclasses import dataclass
+
+FIELDS = ["Name", "Contact", "Email-ID", "Skills"]
+# Field names contain no regex metacharacters, so they are joined without re.escape
+FIELD_ALT = "|".join(FIELDS)
+SECTION_SPLIT = re.compile(rf"^({FIELD_ALT})[^\n]*\n", re.IGNORECASE | re.MULTILINE)
+_FIELD_BY_HEADER = {f.lower(): f for f in FIELDS}
+BULLET_RE = re.compile(r'[-•*]\s*')
+_NL_TABLE = str.maketrans({"\n": " ", "\r": " "})
+
+# Deterministic contact extraction; Gemini is only asked for what these miss
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+PHONE_RE = re.compile(r'\+?\(?\d[\d \-().]{8,}\d')
+# Years, grades and ID numbers also fit the phone shape, so a match is only trusted when it
+# starts with a country code or sits on a phone-labelled line, and never spans these
+PHONE_LABEL_RE = re.compile(r'\b(?:phone|mobile|mob|tel(?:ephone)?|cell|contact|ph)\b', re.IGNORECASE)
+YEAR_RANGE_RE = re.compile(r'(?:19|20)\d\d\s*[-–]\s*(?:19|20)\d\d')
+DECIMAL_RE = re.compile(r'\d\.\d{1,2}\b')
+
+# Resume cleanup before prompting: fewer input tokens, same content
+# At most 3 digits, so phone numbers and years on their own line survive
+PAGE_NUMBER_RE = re.compile(r'\s*(?:Page\s*)?\d{1,3}(?:\s*of\s*\d{1,3})?\s*', re.IGNORECASE)
+BLANK_LINES_RE = re.compile(r'\n{3,}')
+SPACES_RE = re.compile(r'[ \t]{2,}')
+
+def clean_resume(text):
+    # rstrip turns whitespace-only lines into empty ones so blank runs can collapse
+    lines = [line.rstrip() for line in text.splitlines() if not PAGE_NUMBER_RE.fullmatch(line)]
+    text = SPACES_RE.sub(' ', "\n".join(lines))
+    return BLANK_LINES_RE.sub('\n\n', text).strip()
+
+def extract_sections(result_text):
+    # Single pass over the response: each header's content runs up to the next header
+    sections = {}
+    headers = list(SECTION_SPLIT.finditer(result_text))
+    for i, match in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(result_text)
+        field = _FIELD_BY_HEADER[match.group(1).lower()]
+        sections.setdefault(field, result_text[match.end():end].strip())
+    return sections
+
+def extract_contact_fields(resume_text):
+    known = {}
+    # Anything doubtful is left out of `known`, so Gemini is still asked for Contact
+    for match in PHONE_RE.finditer(resume_text):
+        phone = match.group(0)
+        if not 10 <= sum(c.isdigit() for c in phone) <= 15:
+            continue
+        if YEAR_RANGE_RE.search(phone) or DECIMAL_RE.search(phone):
+            continue
+        line_start = resume_text.rfind("\n", 0, match.start()) + 1
+        if phone.startswith("+") or PHONE_LABEL_RE.search(resume_text, line_start, match.start()):
+            known["Contact"] = phone
+            break
+    email = EMAIL_RE.search(resume_text)
+    if email:
+        known["Email-ID"] = email.group(0).rstrip(".")
+    return known
+
+@dataclass(frozen=True)
+class Analysis:
+    fields: dict
+    excel_row: str
+
+# One parse per response: sections, "Not Found" defaults and the Excel row together.
+# Regex-found values in `known` take priority over what Gemini returned.
+def parse_analysis(result_text, known):
+    sections = extract_sections(result_text)
+    fields = {field: known.get(field) or sections.get(field) or "Not Found" for field in FIELDS}
+    excel_row = "\t".join(BULLET_RE.sub('', value.translate(_NL_TABLE)).strip() for value in fields.values())
+    return Analysis(fields, excel_row)
@@ -0,0 +1,49 @@
+import pytest
+
+import parsing
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Phone: (555) 123-4567", "(555) 123-4567"),
+    ("+1 (555) 123-4567", "+1 (555) 123-4567"),
+    ("Mobile: 555 123 4567", "555 123 4567"),
+    ("+91 98765 43210", "+91 98765 43210"),
+    ("+44 20 7946 0958\nLondon", "+44 20 7946 0958"),
+])
+def test_extract_contact_fields_phone_formats(text, expected):
+    assert parsing.extract_contact_fields(text)["Contact"] == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Software Engineer, 2019 - 2021",
+    "Acme Corp (2015 - 2019)\nInitech 2019-2023 2023-2025 2025",
+    "Class XII 2018 - 2020 92.4%",
+    "B.Tech (2016 - 2020) 8.5 CGPA",
+    "GPA 3.8 (2014 - 2018)",
+    "Reg No 2020 1234 5678",
+])
+def test_extract_contact_fields_ignores_date_ranges(text):
+    assert "Contact" not in parsing.extract_contact_fields(text)
+
+
+def test_extract_contact_fields_skips_education_before_phone():
+    text = "B.Tech (2016 - 2020) 8.5 CGPA\nPhone: (555) 123-4567"
+    assert parsing.extract_contact_fields(text)["Contact"] == "(555) 123-4567"
+
+
+def test_extract_contact_fields_email():
+    known = parsing.extract_contact_fields("Reach me at names@jane.dev.")
+    assert known["Email-ID"] == "names@jane.dev"
+
+
+def test_parse_analysis_known_fields_override_response():
+    analysis = parsing.parse_analysis(
+        "Name\nJane\nSkills\n- x\n",
+        {"Contact": "+1 555 123 4567", "Email-ID": "names@jane.dev"},
+    )
+    assert analysis.fields == {
+        "Name": "Jane",
+        "Contact": "+1 555 123 4567",
+        "Email-ID": "names@jane.dev",
+        "Skills": "- x",
+    }